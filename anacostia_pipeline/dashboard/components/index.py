@@ -1,4 +1,5 @@
 from typing import List, Dict
+from html import escape
 
 
 
@@ -84,7 +85,7 @@ def index_template(nodes: List[Dict[str, str]], json_data: str, graph_sse_endpoi
                         <p>Potomac AI Inc.</p>
                     </section>
                 </div>
-                <script src="/static/js/src/dag.js" graph-data="{json_data}"></script>
+                <script src="/static/js/src/dag.js" graph-data="{escape(json_data)}"></script>
             </div>
         </body>
     </html>
@@ -1,7 +1,6 @@
 var scriptTag = document.querySelector('script[src="/static/js/src/dag.js"]');
 
 var graph_data = scriptTag.getAttribute('graph-data');
-graph_data = graph_data.replace(/'/g, '"');
 graph_data = JSON.parse(graph_data);
 
 var nodes = graph_data.nodes;
@@ -3,7 +3,7 @@ from fastapi.responses import HTMLResponse, StreamingResponse
 import asyncio
 from typing import List, Dict, Tuple, Union
 
-from anacostia_pipeline.dashboard.subapps.basenode import BaseNodeApp
+from .basenode import BaseNodeApp
 from ..components.filesystemstore import filesystemstore_home, filesystemstore_viewer, create_table_rows, table_row
 from ..components.utils import format_html_for_sse
 import time
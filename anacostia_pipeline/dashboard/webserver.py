@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 import signal
 from importlib import metadata
 from threading import Thread
@@ -55,7 +56,7 @@ class Webserver(FastAPI):
             frontend_json = self.__frontend_json()
             nodes = frontend_json["nodes"]
             node_headers = self.__headers()
-            return index_template(nodes, frontend_json, "/graph_sse", node_headers)
+            return index_template(nodes, json.dumps(frontend_json), "/graph_sse", node_headers)
 
         @self.get('/graph_sse', response_class=StreamingResponse)
         async def graph_sse(request: Request):
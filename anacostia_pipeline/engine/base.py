@@ -1,9 +1,9 @@
 from __future__ import annotations
 import os
-from threading import Thread, Lock, RLock
-from typing import List, Union, Optional
+from threading import Thread, RLock, Condition
+from typing import List, Tuple, Union, Optional, Callable
 import time
-from logging import Logger
+from logging import Logger, DEBUG, INFO, WARNING, ERROR, CRITICAL
 from datetime import datetime
 from functools import wraps
 import traceback
@@ -16,6 +16,15 @@ from ..dashboard.subapps.basenode import BaseNodeApp
 
 
 
+LOG_LEVELS = {
+    "DEBUG": DEBUG,
+    "INFO": INFO,
+    "WARNING": WARNING,
+    "ERROR": ERROR,
+    "CRITICAL": CRITICAL,
+}
+
+
 class NodeModel(BaseModel):
     '''
     A Pydantic Model for validation and serialization of a BaseNode
@@ -34,8 +43,11 @@ class BaseNode(Thread):
         self, name: str, predecessors: List[BaseNode] = None, 
         loggers: Union[Logger, List[Logger]] = None, endpoint: str = None
     ) -> None:
-        self._status_lock = Lock()
         self._status = Status.OFF
+
+        # notified whenever a signal is delivered to this node or its status changes;
+        # lets the node block until there is something to do instead of polling
+        self._wake = Condition()
         self.work_list = list()
         
         if loggers is None:
@@ -46,11 +58,11 @@ class BaseNode(Thread):
             else:
                 self.loggers: List[Logger] = loggers
         
-        # TODO: replace list with tuple
         if predecessors is None:
-            predecessors = list()
+            predecessors = tuple()
         
-        self.predecessors = predecessors
+        # the predecessors of a node are fixed once the node is created, so they are stored in a tuple
+        self.predecessors: Tuple[BaseNode, ...] = tuple(predecessors)
         self.predecessors_signals = SignalTable()
         self.successors: List[BaseNode] = list()
         self.successors_signals = SignalTable()
@@ -60,9 +72,6 @@ class BaseNode(Thread):
     def get_app(self):
         return BaseNodeApp(self)
 
-    def __hash__(self) -> int:
-        return hash(self.name)
-
     def __repr__(self) -> str:
         return f"'Node(name: {self.name})'"
     
@@ -82,34 +91,32 @@ class BaseNode(Thread):
 
     def log(self, message: str, level="DEBUG") -> None:
         if len(self.loggers) > 0:
+            if level not in LOG_LEVELS:
+                raise ValueError(f"Invalid log level: {level}")
+
+            level_num = LOG_LEVELS[level]
             for logger in self.loggers:
-                if level == "DEBUG":
-                    logger.debug(message)
-                elif level == "INFO":
-                    logger.info(message)
-                elif level == "WARNING":
-                    logger.warning(message)
-                elif level == "ERROR":
-                    logger.error(message)
-                elif level == "CRITICAL":
-                    logger.critical(message)
-                else:
-                    raise ValueError(f"Invalid log level: {level}")
+                logger.log(level_num, message)
         else:
             print(message)
 
     @property
     def status(self):
-        while True:
-            with self._status_lock:
-                return self._status
+        # reading/assigning a single attribute is atomic, no lock is needed here
+        return self._status
 
     @status.setter
     def status(self, value: Status):
-        while True:
-            with self._status_lock:
-                self._status = value
-                break
+        with self._wake:
+            self._status = value
+            self._wake.notify_all()
+
+    def _notify(self) -> None:
+        """
+        Wake up the thread running this node if it is waiting on signals or paused.
+        """
+        with self._wake:
+            self._wake.notify_all()
 
     def trap_interrupts(self):
         if self.status == Status.PAUSING:
@@ -117,8 +124,8 @@ class BaseNode(Thread):
             self.status = Status.PAUSED
 
             # Wait until the node is resumed by the pipeline calling resume()
-            while self.status == Status.PAUSED:
-                time.sleep(0.1)
+            with self._wake:
+                self._wake.wait_for(lambda: self._status != Status.PAUSED)
 
         if self.status == Status.EXITING:
             self.log(f"Node '{self.name}' exiting at {datetime.now()}")
@@ -140,76 +147,86 @@ class BaseNode(Thread):
         return wrapper
     
     def signal_successors(self, result: Result):
+        # If there are no successors, then there is no one to signal
+        if len(self.successors) == 0:
+            return
+
+        # take one snapshot of the received signals instead of locking the table for every successor
+        received_signals = dict(self.successors_signals.items())
+
+        # all signals sent in one call share the same timestamp
+        timestamp = time.time_ns()
         for successor in self.successors:
             msg = Signal(
                 sender = self.name,
                 receiver = successor.name,
-                timestamp = datetime.now(),
+                timestamp = timestamp,
                 result = result
             )
-            if successor.name not in self.successors_signals.keys():
+            if successor.name not in received_signals:
                 successor.predecessors_signals[self.name] = msg
             else:
-                if self.successors_signals[successor.name].result != Result.SUCCESS:
+                if received_signals[successor.name].result != Result.SUCCESS:
                     successor.predecessors_signals[self.name] = msg
+            successor._notify()
 
     def signal_predecessors(self, result: Result):
+        # If there are no predecessors, then there is no one to signal
+        if len(self.predecessors) == 0:
+            return
+
+        # take one snapshot of the received signals instead of locking the table for every predecessor
+        received_signals = dict(self.predecessors_signals.items())
+
+        # all signals sent in one call share the same timestamp
+        timestamp = time.time_ns()
         for predecessor in self.predecessors:
             msg = Signal(
                 sender = self.name,
                 receiver = predecessor.name,
-                timestamp = datetime.now(),
+                timestamp = timestamp,
                 result = result
             )
-            if predecessor.name not in self.predecessors_signals.keys():
+            if predecessor.name not in received_signals:
                 predecessor.successors_signals[self.name] = msg
             else:
-                if self.predecessors_signals[predecessor.name].result != Result.SUCCESS:
+                if received_signals[predecessor.name].result != Result.SUCCESS:
                     predecessor.successors_signals[self.name] = msg
+            predecessor._notify()
 
     def check_predecessors_signals(self) -> bool:
         # If there are no predecessors, then we can just return True
         if len(self.predecessors) == 0:
             return True
 
-        # If there are predecessors, but no signals, then we can return False
-        if len(self.predecessors_signals) == 0:
-            return False
-
-        # Check if all the predecessors have sent a signal
-        if len(self.predecessors_signals) == len(self.predecessors):
-
-            # Check if all predecessors have sent a success signal
-            if all([sig.result == Result.SUCCESS for sig in self.predecessors_signals.values()]):
-
-                # Reset the received signals
-                self.predecessors_signals = SignalTable()
-                return True
-            else:
-                return False
-        else:
-            return False
+        # Check if all predecessors have sent a success signal, and if so, reset the received signals
+        return self.predecessors_signals.reset_if_complete(len(self.predecessors))
  
     def check_successors_signals(self) -> bool:
         # If there are no successors, then we can just return True
         if len(self.successors) == 0:
             return True
 
-        # If there are successors, but no signals, then we can return False
-        if len(self.successors_signals) == 0:
-            return False
+        # Check if all successors have sent a success signal, and if so, reset the received signals
+        return self.successors_signals.reset_if_complete(len(self.successors))
 
-        # Check if the signals match the execute condition
-        if len(self.successors_signals) == len(self.successors):
-            if all([sig.result == Result.SUCCESS for sig in self.successors_signals.values()]):
+    def wait_for_signals(self, check_signals: Callable[[], bool]) -> None:
+        """
+        Block until check_signals() returns True (e.g., check_predecessors_signals or check_successors_signals).
+        The node sleeps on its condition variable and is woken up by incoming signals and status changes,
+        so pause and exit requests are still handled while waiting.
+        """
+        ready = False
 
-                # Reset the received signals
-                self.successors_signals = SignalTable()
-                return True
-            else:
-                return False
-        else:
-            return False
+        def predicate() -> bool:
+            nonlocal ready
+            ready = check_signals() is True
+            return ready or self.status in (Status.PAUSING, Status.EXITING)
+
+        while ready is False:
+            self.trap_interrupts()
+            with self._wake:
+                self._wake.wait_for(predicate)
 
     def pause(self):
         self.status = Status.PAUSING
@@ -277,12 +294,10 @@ class BaseMetadataStoreNode(BaseNode):
     def metadata_accessor(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            # keep trying to acquire lock until function is finished
-            # generally, it is best practice to use lock inside of a while loop to avoid race conditions (recall GMU CS 571)
-            while True:
-                with self.resource_lock:
-                    result = func(self, *args, **kwargs)
-                    return result
+            # acquiring the lock blocks until it is available, so there is no need to retry in a loop;
+            # resource_lock is an RLock because decorated methods call each other while holding it
+            with self.resource_lock:
+                return func(self, *args, **kwargs)
         return wrapper
     
     @metadata_accessor
@@ -293,6 +308,10 @@ class BaseMetadataStoreNode(BaseNode):
     def create_entry(self, resource_node: 'BaseResourceNode', **kwargs) -> None:
         raise NotImplementedError
 
+    @metadata_accessor
+    def create_entries(self, resource_node: 'BaseResourceNode', rows: List[Tuple[str, str, Optional[int]]]) -> None:
+        raise NotImplementedError
+
     @metadata_accessor
     def get_entries(self, resource_node: 'BaseResourceNode') -> List[dict]:
         pass
@@ -354,9 +373,7 @@ class BaseMetadataStoreNode(BaseNode):
             # waiting for all resource nodes to signal their resources are ready to be used
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_SUCCESSORS)
-            while self.check_successors_signals() is False:
-                self.trap_interrupts()
-                time.sleep(0.2)
+            self.wait_for_signals(self.check_successors_signals)
             self.work_list.remove(Work.WAITING_SUCCESSORS)
             # note: since the UI polls the work_list every 500ms, the UI will always display WAITING_SUCCESSORS 
             # because it doesn't (and possibly can never) poll fast enough to catch the work_list without WAITING_SUCCESSORS
@@ -375,9 +392,7 @@ class BaseMetadataStoreNode(BaseNode):
             # waiting for all resource nodes to signal they are done using the current state
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_SUCCESSORS)
-            while self.check_successors_signals() is False:
-                self.trap_interrupts()
-                time.sleep(0.2)
+            self.wait_for_signals(self.check_successors_signals)
             self.work_list.remove(Work.WAITING_SUCCESSORS)
             
             # ending the run
@@ -404,16 +419,15 @@ class BaseResourceNode(BaseNode):
         self.resource_lock = RLock()
         self.monitoring = monitoring
         self.metadata_store = metadata_store
+        self.triggered = False
 
     def resource_accessor(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            # keep trying to acquire lock until function is finished
-            # generally, it is best practice to use lock inside of a while loop to avoid race conditions (recall GMU CS 571)
-            while True:
-                with self.resource_lock:
-                    result = func(self, *args, **kwargs)
-                    return result
+            # acquiring the lock blocks until it is available, so there is no need to retry in a loop;
+            # resource_lock is an RLock because decorated methods call each other while holding it
+            with self.resource_lock:
+                return func(self, *args, **kwargs)
         return wrapper
     
     def monitoring_enabled(func):
@@ -432,6 +446,7 @@ class BaseResourceNode(BaseNode):
         """
         Override to specify how the resource is monitored. 
         Typically, this method will be used to start an observer that runs in a child thread spawned by the thread running the node.
+        The observer should call trigger() (record_new() and record_current() do this) whenever it detects a change to the resource.
         """
         pass
 
@@ -444,6 +459,25 @@ class BaseResourceNode(BaseNode):
         """
         pass
 
+    def trigger(self) -> None:
+        """
+        Let the node know the resource has changed so it re-evaluates trigger_condition().
+        Called by record_new() and record_current() after they record a change to the resource.
+        """
+        with self._wake:
+            self.triggered = True
+            self._wake.notify_all()
+
+    def wait_for_trigger(self, timeout: float = 0.1) -> None:
+        """
+        Block until trigger() is called, the node is asked to pause or exit, or the timeout expires.
+        The timeout makes sure trigger conditions that depend on state outside of the observer (e.g., the time of day) 
+        are still re-evaluated periodically.
+        """
+        with self._wake:
+            self._wake.wait_for(lambda: self.triggered or self.status in (Status.PAUSING, Status.EXITING), timeout=timeout)
+            self.triggered = False
+
     def on_exit(self):
         if self.monitoring is True:
             self.stop_monitoring()
@@ -453,7 +487,8 @@ class BaseResourceNode(BaseNode):
     @resource_accessor
     def record_new(self) -> None:
         """
-        override to specify how to detect new files and mark the detected files as 'new'
+        override to specify how to detect new files and mark the detected files as 'new';
+        call self.trigger() after recording so the node re-evaluates trigger_condition()
         """
         raise NotImplementedError
     
@@ -461,7 +496,8 @@ class BaseResourceNode(BaseNode):
     @resource_accessor
     def record_current(self) -> None:
         """
-        override to specify how to label newly created files as 'current'
+        override to specify how to label newly created files as 'current';
+        call self.trigger() after recording so the node re-evaluates trigger_condition()
         """
         pass
     
@@ -481,16 +517,17 @@ class BaseResourceNode(BaseNode):
             if self.monitoring is True:
                 self.trap_interrupts()
                 self.work_list.append(Work.WAITING_RESOURCE)
+
+                # back off exponentially (up to 50 ms) while trigger_condition() keeps raising; reset once it succeeds
+                delay = 0.0005
                 while True:
                     self.trap_interrupts()
                     try:
-                        if self.trigger_condition() is True:
-                            break
-                        else:
-                            self.trap_interrupts()
-                            time.sleep(0.1)
+                        triggered = self.trigger_condition()
                     except Exception as e:
                         self.log(f"Error checking resource in node '{self.name}': {traceback.format_exc()}")
+                        time.sleep(delay)
+                        delay = min(delay * 2, 0.05)
                         continue
                         # Note: we continue here because we want to keep trying to check the resource until it is available
                         # with that said, we should add an option for the user to specify the number of times to try before giving up
@@ -499,6 +536,13 @@ class BaseResourceNode(BaseNode):
                         # We should also think about adding an option for the user to specify what actions to take in the case of an exception,
                         # e.g., send an email to the data science team to let everyone know the resource is corrupted, 
                         # or just not move the file to current.
+
+                    delay = 0.0005
+                    if triggered is True:
+                        break
+
+                    # sleep until the observer reports a change to the resource instead of polling trigger_condition()
+                    self.wait_for_trigger()
                 self.work_list.remove(Work.WAITING_RESOURCE)
                 
             # signal to metadata store node that the resource is ready to be used for the next run
@@ -510,9 +554,7 @@ class BaseResourceNode(BaseNode):
             # wait for metadata store node to finish creating the run 
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_PREDECESSORS)
-            while self.check_predecessors_signals() is False:
-                self.trap_interrupts()
-                time.sleep(0.2)
+            self.wait_for_signals(self.check_predecessors_signals)
             self.work_list.remove(Work.WAITING_PREDECESSORS)
 
             # signalling to all successors that the resource is ready to be used for the current run
@@ -522,9 +564,7 @@ class BaseResourceNode(BaseNode):
             # waiting for all successors to finish using the the resource for the current run
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_SUCCESSORS)
-            while self.check_successors_signals() is False:
-                self.trap_interrupts()
-                time.sleep(0.2)
+            self.wait_for_signals(self.check_successors_signals)
             self.work_list.remove(Work.WAITING_SUCCESSORS)
 
             # signal the metadata store node that the action nodes have finish using the resource for the current run
@@ -534,9 +574,7 @@ class BaseResourceNode(BaseNode):
             # wait for acknowledgement from metadata store node that the run has been ended
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_PREDECESSORS)
-            while self.check_predecessors_signals() is False:
-                self.trap_interrupts()
-                time.sleep(0.2)
+            self.wait_for_signals(self.check_predecessors_signals)
             self.work_list.remove(Work.WAITING_PREDECESSORS)
             
 
@@ -596,9 +634,7 @@ class BaseActionNode(BaseNode):
         while True:
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_PREDECESSORS)
-            while self.check_predecessors_signals() is False:
-                time.sleep(0.2)
-                self.trap_interrupts()
+            self.wait_for_signals(self.check_predecessors_signals)
             self.work_list.remove(Work.WAITING_PREDECESSORS)
             
             self.trap_interrupts()
@@ -645,9 +681,7 @@ class BaseActionNode(BaseNode):
             # ensure all action nodes have finished using the resource for current run
             self.trap_interrupts()
             self.work_list.append(Work.WAITING_SUCCESSORS)
-            while self.check_successors_signals() is False:
-                time.sleep(0.2)
-                self.trap_interrupts()
+            self.wait_for_signals(self.check_successors_signals)
             self.work_list.remove(Work.WAITING_SUCCESSORS)
 
             self.trap_interrupts()
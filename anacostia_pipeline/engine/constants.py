@@ -29,15 +29,6 @@ class Status(Enum):
     
     def __int__(self) -> int:
         return self.value
-    
-    def __eq__(self, other: 'Status') -> bool:
-        if other.value == self.value:
-            return True
-        else:
-            return False
-    
-    def __hash__(self) -> int:
-        return super().__hash__()
 
 
 class Work(Enum):
@@ -77,15 +68,6 @@ class Work(Enum):
     
     def __int__(self) -> int:
         return self.value
-    
-    def __eq__(self, other: 'Work') -> bool:
-        if other.value == self.value:
-            return True
-        else:
-            return False
-    
-    def __hash__(self) -> int:
-        return super().__hash__()
 
 
 class Result(Enum):
@@ -103,12 +85,3 @@ class Result(Enum):
 
     def __int__(self) -> int:
         return self.value
-    
-    def __eq__(self, other: 'Result') -> bool:
-        if other.value == self.value:
-            return True
-        else:
-            return False
-    
-    def __hash__(self) -> int:
-        return super().__hash__()
\ No newline at end of file
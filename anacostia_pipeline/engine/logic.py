@@ -1,13 +1,9 @@
 from typing import List
-import time
 from logging import Logger
 
-if __name__ == "__main__":
-    from base import BaseActionNode, BaseNode
-    from constants import Result
-else:
-    from engine.base import BaseActionNode, BaseNode, Message
-    from engine.constants import Result
+from .base import BaseActionNode, BaseNode
+from .constants import Result
+from .utils import Signal
 
 
 
@@ -25,16 +21,14 @@ class AndAndNode(BaseNode):
 
     def run(self):
         while True:
-            while self.check_predecessors_signals() is False:
-                time.sleep(0.1)
+            self.wait_for_signals(self.check_predecessors_signals)
 
             self.log("all resource nodes have finished updating its state.")
             self.signal_successors(Result.SUCCESS)
 
             # checking for successors signals before signalling predecessors will 
             # ensure all action nodes have finished using the current state
-            while self.check_successors_signals() is False:
-                time.sleep(0.1)
+            self.wait_for_signals(self.check_successors_signals)
             
             self.log("all action nodes have finished using the current state.")
             self.signal_predecessors(Result.SUCCESS)
@@ -55,7 +49,7 @@ class OrAndNode(BaseNode):
 
             # Pull out the queued up incoming signals and register them
             while not self.predecessors_queue.empty():
-                sig: Message = self.predecessors_queue.get()
+                sig: Signal = self.predecessors_queue.get()
 
                 if sig.sender not in self.received_predecessors_signals:
                     self.received_predecessors_signals[sig.sender] = sig.result
@@ -81,18 +75,13 @@ class OrAndNode(BaseNode):
 
     def run(self):
         while True:
-            super().trap_interrupts()
-            while self.check_predecessors_signals() is False:
-                time.sleep(0.2)
-                super().trap_interrupts()
+            self.wait_for_signals(self.check_predecessors_signals)
 
             super().trap_interrupts()
             self.log("all resource nodes have finished updating its state.")
             self.signal_successors(Result.SUCCESS)
 
-            super().trap_interrupts()
-            while self.check_successors_signals() is False:
-                time.sleep(0.2)
+            self.wait_for_signals(self.check_successors_signals)
             
             super().trap_interrupts()
             self.log("all action nodes have finished using the current state.")
@@ -1,12 +1,13 @@
-from typing import List, Iterable, Union
-from threading import Thread
+from typing import List, Dict, Iterable, Union
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import traceback
 from logging import Logger
 
 from pydantic import BaseModel, ConfigDict
 import networkx as nx
 
-from .base import BaseResourceNode, BaseNode, BaseMetadataStoreNode, NodeModel, BaseActionNode
+from .base import BaseResourceNode, BaseNode, BaseMetadataStoreNode, NodeModel
 from .constants import Status
 
 
@@ -42,19 +43,22 @@ class Pipeline:
         self.node_dict = dict()
         self.graph = nx.DiGraph()
 
-        # Add nodes into graph
+        # Collect the edges and the successors of every node in a single pass over the predecessors
+        edges = []
+        successors: Dict[BaseNode, List[BaseNode]] = {node: [] for node in nodes}
         for node in nodes:
-            self.graph.add_node(node)
             self.node_dict[node.name] = node
-
-        # Add edges into graph
-        for node in nodes:
             for predecessor in node.predecessors:
-                self.graph.add_edge(predecessor, node)
+                edges.append((predecessor, node))
+                successors.setdefault(predecessor, []).append(node)
+
+        # Add nodes and edges into graph
+        self.graph.add_nodes_from(nodes)
+        self.graph.add_edges_from(edges)
         
         # set successors for all nodes
         for node in nodes:
-            node.successors = list(self.graph.successors(node))
+            node.successors = successors[node]
         
         # Set logger for all nodes
         if loggers is not None:
@@ -77,28 +81,29 @@ class Pipeline:
         
         # check 4: make sure there is only one metadata store node
         for node in self.nodes:
-            if (node != self.nodes[0]) and (isinstance(nodes, BaseMetadataStoreNode) is True):
+            if (node != self.nodes[0]) and (isinstance(node, BaseMetadataStoreNode) is True):
                 raise InvalidNodeDependencyError("There can only be one metadata store node")
                 
         # set metadata store node
         self.metadata_store = self.nodes[0]
 
         # check 5: make sure all resource nodes are successors of the metadata store node
+        metadata_store_successors = frozenset(self.graph.successors(self.metadata_store))
         for node in self.nodes:
             if isinstance(node, BaseResourceNode) is True:
-                if node not in list(self.graph.successors(self.metadata_store)):
+                if node not in metadata_store_successors:
                     raise InvalidNodeDependencyError("All resource nodes must be successors of the metadata store node")
 
         # check 6: make sure all resource nodes have at least one successor
         for node in self.nodes:
             if isinstance(node, BaseResourceNode) is True:
-                if len(list(self.graph.successors(node))) == 0:
+                if len(node.successors) == 0:
                     raise InvalidNodeDependencyError("All resource nodes must have at least one successor")
 
         # check 7: make sure all successors of a resource node are action nodes 
         for node in self.nodes:
             if isinstance(node, BaseResourceNode) is True:
-                for successor in list(self.graph.successors(node)):
+                for successor in node.successors:
                     if (isinstance(successor, BaseMetadataStoreNode) is True) or (isinstance(successor, BaseResourceNode) is True):
                         raise InvalidNodeDependencyError("All successors of a resource node must be action nodes")
 
@@ -113,34 +118,37 @@ class Pipeline:
         Sets up all the nodes in the pipeline.
         """
 
-        threads = []
-        for node in nodes:
-            node.log(f"--------------------------- started setup phase of {node.name} at {datetime.now()}")
-            thread = Thread(target=node.setup)
-            node.status = Status.INIT
-            thread.start()
-            threads.append(thread)
+        if len(nodes) == 0:
+            return
 
-        for thread, node in zip(threads, nodes):
-            thread.join()
-            node.log(f"--------------------------- finished setup phase of {node.name} at {datetime.now()}")
+        # one worker per node: setup() may block for a long time (e.g., pulling a docker image), 
+        # so every node's setup has to be able to run at the same time
+        with ThreadPoolExecutor(max_workers=len(nodes), thread_name_prefix="setup") as executor:
+            futures = []
+            for node in nodes:
+                node.log(f"--------------------------- started setup phase of {node.name} at {datetime.now()}")
+                node.status = Status.INIT
+                futures.append(executor.submit(node.setup))
+
+            for future, node in zip(futures, nodes):
+                exception = future.exception()
+                if exception is not None:
+                    node.log(f"Error in setup phase of {node.name}: {''.join(traceback.format_exception(exception))}", level="ERROR")
+                node.log(f"--------------------------- finished setup phase of {node.name} at {datetime.now()}")
 
     def launch_nodes(self):
         """
         Lanches all the registered nodes in topological order.
         """
 
-        # set up metadata store nodes
+        # set up metadata store nodes first; resource nodes register themselves with the metadata store during their setup
         metadata_stores = [node for node in self.nodes if isinstance(node, BaseMetadataStoreNode) is True]
         self.setup_nodes(metadata_stores)
 
-        # set up resource nodes
-        resource_nodes = [node for node in self.nodes if isinstance(node, BaseResourceNode) is True]
-        self.setup_nodes(resource_nodes)
-        
-        # set up action nodes
-        action_nodes = [node for node in self.nodes if isinstance(node, BaseActionNode) is True]
-        self.setup_nodes(action_nodes)
+        # set up resource nodes and action nodes concurrently;
+        # setup only depends on the metadata store, so action nodes don't need to wait for the slowest resource node
+        other_nodes = [node for node in self.nodes if isinstance(node, BaseMetadataStoreNode) is False]
+        self.setup_nodes(other_nodes)
 
         # start nodes
         for node in self.nodes:
@@ -1,18 +1,22 @@
 from threading import Lock
 from datetime import datetime
-from pydantic import BaseModel
-from typing import List
+from typing import List, NamedTuple
 
 from .constants import Result
 
-class Signal(BaseModel):
+class Signal(NamedTuple):
+    # signals only travel between threads of the same process, 
+    # so they're plain tuples rather than pydantic models that get validated every time one is created
     sender: str
     receiver: str
-    timestamp: datetime
+    timestamp: int      # nanoseconds since the epoch, as returned by time.time_ns()
     result: Result = None
 
+    def as_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp / 1e9)
+
     def __repr__(self) -> str:
-        return f"Signal (sender: {self.sender}, receiver: {self.receiver}, timestamp: {str(self.timestamp)}, result: {self.result})"
+        return f"Signal (sender: {self.sender}, receiver: {self.receiver}, timestamp: {str(self.as_datetime())}, result: {self.result})"
 
 class SignalTable:
     def __init__(self) -> None:
@@ -20,43 +24,45 @@ class SignalTable:
         self.table_lock = Lock()
 
     def __getitem__(self, key: str) -> Signal:
-        while True:
-            with self.table_lock:
-                return self.table[key]
+        with self.table_lock:
+            return self.table[key]
 
     def __setitem__(self, key: str, value: Signal) -> None:
-        while True:
-            with self.table_lock:
-                self.table[key] = value
-                return
+        with self.table_lock:
+            self.table[key] = value
 
     def __delitem__(self, key) -> None:
-        while True:
-            with self.table_lock:
-                del self.table[key]
-                return
+        with self.table_lock:
+            del self.table[key]
 
     def keys(self) -> List[str]:
-        while True:
-            with self.table_lock:
-                return list(self.table.keys())
+        with self.table_lock:
+            return list(self.table.keys())
 
     def values(self) -> List[Signal]:
-        while True:
-            with self.table_lock:
-                return list(self.table.values())
+        with self.table_lock:
+            return list(self.table.values())
 
     def items(self) -> List[tuple]:
-        while True:
-            with self.table_lock:
-                return list(self.table.items())
+        with self.table_lock:
+            return list(self.table.items())
+    
+    def reset_if_complete(self, num_signals: int) -> bool:
+        """
+        Clear the table and return True if it holds num_signals signals and all of them are successes.
+        The check and the reset are done under a single acquisition of the lock, 
+        so a signal arriving in between can't be dropped by the reset.
+        """
+        with self.table_lock:
+            if len(self.table) == num_signals and all(sig.result is Result.SUCCESS for sig in self.table.values()):
+                self.table = dict()
+                return True
+            return False
     
     def __len__(self) -> int:
-        while True:
-            with self.table_lock:
-                return len(self.table)
+        with self.table_lock:
+            return len(self.table)
 
     def __repr__(self) -> str:
-        while True:
-            with self.table_lock:
-                return "TODO: implement this"
+        with self.table_lock:
+            return "TODO: implement this"
@@ -1,9 +1,11 @@
 from logging import Logger
-from typing import List, Dict
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Float
+from typing import List, Dict, Tuple, Optional
+from sqlalchemy import create_engine, event, func, exists, Column, Index, Integer, String, DateTime, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
-from datetime import datetime
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.engine import make_url
+from datetime import datetime, timezone
 import os
 from contextlib import contextmanager
 import traceback
@@ -15,10 +17,14 @@ from ..dashboard.subapps.sqlmetadatastore import SqliteMetadataStoreApp
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    # datetime.utcnow() is deprecated; the timezone is dropped when sqlite stores the value, so the columns still hold UTC
+    return datetime.now(timezone.utc)
+
 class Run(Base):
     __tablename__ = 'runs'
     id = Column(Integer, primary_key=True)
-    start_time = Column(DateTime, default=datetime.utcnow)
+    start_time = Column(DateTime, default=utcnow)
     end_time = Column(DateTime)
 
     def as_dict(self):
@@ -56,13 +62,17 @@ class Tag(Base):
 
 class Sample(Base):
     __tablename__ = 'samples'
+    __table_args__ = (
+        Index("ix_samples_node_state", "node_id", "state"),
+        Index("ix_samples_node_run_end", "node_id", "run_id", "end_time"),
+    )
     id = Column(Integer, primary_key=True)
     run_id = Column(Integer)
     node_id = Column(Integer)
     location = Column(String)
     state = Column(String, default="new")
     end_time = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow)
 
     def as_dict(self):
        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
@@ -72,15 +82,15 @@ class Node(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String)
     type = Column(String)
-    init_time = Column(DateTime, default=datetime.utcnow)
+    init_time = Column(DateTime, default=utcnow)
 
     def as_dict(self):
        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
 
 @contextmanager
-def scoped_session_manager(session_factory: sessionmaker, node: BaseNode) -> scoped_session: # type: ignore
-    ScopedSession = scoped_session(session_factory)
+def scoped_session_manager(ScopedSession: scoped_session, node: BaseNode) -> scoped_session: # type: ignore
+    # ScopedSession is the thread-local session registry created once in SqliteMetadataStore.setup()
     session = ScopedSession()
 
     try:
@@ -91,56 +101,100 @@ def scoped_session_manager(session_factory: sessionmaker, node: BaseNode) -> sco
         node.log(f"Node {node.name} rolled back session.", level="ERROR")
         raise e
     finally:
-        ScopedSession.close()
+        ScopedSession.remove()
 
 
 
 class SqliteMetadataStore(BaseMetadataStoreNode):
     def __init__(self, name: str, uri: str, loggers: Logger | List[Logger] = None) -> None:
         super().__init__(name, uri, loggers)
+        self._node_id_cache: Dict[str, int] = dict()
+
+        # id of the run in progress, set by start_run() and cleared by end_run()
+        self._current_run_id: Optional[int] = None
 
     # Note: override the get_app() method to return the custom router
     def get_app(self) -> SqliteMetadataStoreApp:
         return SqliteMetadataStoreApp(self)
 
     def setup(self) -> None:
-        path = self.uri.strip('sqlite:///')
-        path = path.split('/')[0:-1]
-        path = '/'.join(path)
-        if os.path.exists(path) is False:
-            os.makedirs(path, exist_ok=True)
+        # in-memory databases (sqlite:// or sqlite:///:memory:) have no file, so there is no directory to create
+        path = make_url(self.uri).database
+        if path not in (None, "", ":memory:"):
+            dirpath = os.path.dirname(path)
+            if dirpath:
+                os.makedirs(dirpath, exist_ok=True)
 
         # Create an engine that stores data in the local directory's sqlite.db file.
-        engine = create_engine(f'{self.uri}', connect_args={"check_same_thread": False})
+        engine = create_engine(
+            f'{self.uri}', connect_args={"check_same_thread": False}, 
+            poolclass=QueuePool, pool_size=5, max_overflow=-1
+        )
+
+        # Tune every new connection: WAL lets readers work while a write is in progress and, with synchronous=NORMAL,
+        # commits no longer wait on an fsync of the database file each time.
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-65536")
+            cursor.execute("PRAGMA mmap_size=268435456")
+            cursor.close()
 
         # Create all tables in the engine (this is equivalent to "Create Table" statements in raw SQL).
         Base.metadata.create_all(engine)
 
+        # create_all() skips tables that already exist, so add the indexes to databases created before they were declared
+        for index in Sample.__table__.indexes:
+            index.create(engine, checkfirst=True)
+
         # Create a sessionmaker, binding it to the engine
         self.session_factory = sessionmaker(bind=engine)
 
+        # Create the thread-local session registry once; every metadata operation checks its session out of it
+        self.ScopedSession = scoped_session(self.session_factory)
+
+    def _get_node_id(self, session, name: str) -> int:
+        # the id of a node's resource tracker never changes, so it's only queried the first time it's needed
+        node_id = self._node_id_cache.get(name)
+        if node_id is None:
+            # every setup() adds another tracker row for the node, so a database reused across restarts has several rows
+            # with the same name; always resolve to the oldest one
+            row = session.query(Node.id).filter_by(name=name).order_by(Node.id).first()
+            if row is None:
+                raise ValueError(f"No resource tracker found for node '{name}'; was create_resource_tracker() called?")
+
+            node_id = row.id
+            self._node_id_cache[name] = node_id
+        return node_id
+
     def get_run_id(self) -> int:
-        with scoped_session_manager(self.session_factory, self) as session:
+        if self._current_run_id is not None:
+            return self._current_run_id
+
+        with scoped_session_manager(self.ScopedSession, self) as session:
             run = session.query(Run).filter_by(end_time=None).first()
             return run.id
     
     def get_runs(self) -> List[Dict]:
-        with scoped_session_manager(self.session_factory, self) as session:
+        with scoped_session_manager(self.ScopedSession, self) as session:
             runs = session.query(Run).all()
             runs = [run.as_dict() for run in runs]
             return runs
     
     def get_num_entries(self, resource_node: BaseResourceNode, state: str) -> int:
         # add some assertion statements here to check if state is "new", "current", "old", or "all"
-        with scoped_session_manager(self.session_factory, resource_node) as session:
-            node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
+            node_id = self._get_node_id(session, resource_node.name)
             if state == "all":
-                return session.query(Sample).filter_by(node_id=node_id).count()
+                return session.query(func.count(Sample.id)).filter_by(node_id=node_id).scalar()
             else:
-                return session.query(Sample).filter_by(node_id=node_id, state=state).count()
+                return session.query(func.count(Sample.id)).filter_by(node_id=node_id, state=state).scalar()
     
     def create_resource_tracker(self, resource_node: BaseResourceNode) -> None:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
             resource_name = resource_node.name
             type_name = type(resource_node).__name__
             node = Node(name=resource_name, type=type_name)
@@ -148,21 +202,21 @@ class SqliteMetadataStore(BaseMetadataStoreNode):
             session.commit()
 
     def log_metrics(self, **kwargs) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
-            run_id = self.get_run_id()
+        run_id = self.get_run_id()
+        with scoped_session_manager(self.ScopedSession, self) as session:
             for key, value in kwargs.items():
                 metric = Metric(run_id=run_id, key=key, value=value)
                 session.add(metric)
             session.commit()
     
     def get_metrics(self, resource_node: BaseResourceNode, state: str = "all") -> List[Dict]:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
             if (resource_node != "all") and (state != "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 metrics = session.query(Metric).filter_by(node_id=node_id, state=state).all()
         
             elif (resource_node != "all") and (state == "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 metrics = session.query(Metric).filter_by(node_id=node_id).all()
 
             elif (resource_node == "all") and (state == "all"):
@@ -175,13 +229,13 @@ class SqliteMetadataStore(BaseMetadataStoreNode):
             return metrics
     
     def get_params(self, resource_node: BaseResourceNode, state: str = "all") -> List[Dict]:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
             if (resource_node != "all") and (state != "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 params = session.query(Param).filter_by(node_id=node_id, state=state).all()
         
             elif (resource_node != "all") and (state == "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 params = session.query(Param).filter_by(node_id=node_id).all()
 
             elif (resource_node == "all") and (state == "all"):
@@ -194,13 +248,13 @@ class SqliteMetadataStore(BaseMetadataStoreNode):
             return params
     
     def get_tags(self, resource_node: BaseResourceNode, state: str = "all") -> List[Dict]:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
             if (resource_node != "all") and (state != "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 tags = session.query(Tag).filter_by(node_id=node_id, state=state).all()
         
             elif (resource_node != "all") and (state == "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 tags = session.query(Tag).filter_by(node_id=node_id).all()
 
             elif (resource_node == "all") and (state == "all"):
@@ -213,29 +267,29 @@ class SqliteMetadataStore(BaseMetadataStoreNode):
             return tags
 
     def log_params(self, **kwargs) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
-            run_id = self.get_run_id()
+        run_id = self.get_run_id()
+        with scoped_session_manager(self.ScopedSession, self) as session:
             for key, value in kwargs.items():
                 param = Param(run_id=run_id, key=key, value=value)
                 session.add(param)
             session.commit()
     
     def set_tags(self, **kwargs) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
-            run_id = self.get_run_id()
+        run_id = self.get_run_id()
+        with scoped_session_manager(self.ScopedSession, self) as session:
             for key, value in kwargs.items():
                 tag = Tag(run_id=run_id, key=key, value=value)
                 session.add(tag)
             session.commit()
 
     def get_entries(self, resource_node: BaseResourceNode = "all", state: str = "all") -> List[Dict]:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
             if (resource_node != "all") and (state != "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 samples = session.query(Sample).filter_by(node_id=node_id, state=state).all()
 
             elif (resource_node != "all") and (state == "all"):
-                node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+                node_id = self._get_node_id(session, resource_node.name)
                 samples = session.query(Sample).filter_by(node_id=node_id).all()
 
             elif (resource_node == "all") and (state == "all"):
@@ -248,56 +302,66 @@ class SqliteMetadataStore(BaseMetadataStoreNode):
             return samples
     
     def get_entry(self, resource_node: BaseResourceNode, id: int) -> Sample:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
-            node_id = session.query(Node).filter_by(name=resource_node.name).first().id
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
+            node_id = self._get_node_id(session, resource_node.name)
             return session.query(Sample).filter_by(node_id=node_id, id=id).first()
         
     def entry_exists(self, resource_node: BaseResourceNode, filepath: str) -> bool:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
-            node_id = session.query(Node).filter_by(name=resource_node.name).first().id
-            return session.query(Sample).filter_by(node_id=node_id, location=filepath).count() > 0
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
+            node_id = self._get_node_id(session, resource_node.name)
+            return session.query(exists().where(Sample.node_id == node_id, Sample.location == filepath)).scalar()
 
     def create_entry(self, resource_node: BaseResourceNode, filepath: str, state: str = "new", run_id: int = None) -> Dict:
-        with scoped_session_manager(self.session_factory, resource_node) as session:
+        self.create_entries(resource_node, [(filepath, state, run_id)])
+
+    def create_entries(self, resource_node: BaseResourceNode, rows: List[Tuple[str, str, Optional[int]]]) -> None:
+        # rows are (filepath, state, run_id) tuples; all of them are inserted in a single transaction
+        with scoped_session_manager(self.ScopedSession, resource_node) as session:
             # in the future, refactor this by changing filepath to uri 
-            node_id = session.query(Node).filter_by(name=resource_node.name).first().id
-            sample = Sample(node_id=node_id, location=filepath, state=state, run_id=run_id)
-            session.add(sample)
+            node_id = self._get_node_id(session, resource_node.name)
+            session.bulk_insert_mappings(
+                Sample, 
+                [{"node_id": node_id, "location": filepath, "state": state, "run_id": run_id} for filepath, state, run_id in rows]
+            )
             session.commit()
     
+    def _get_resource_node_ids(self, session) -> List[int]:
+        return [
+            self._get_node_id(session, successor.name) for successor in self.successors if isinstance(successor, BaseResourceNode)
+        ]
+
     def add_run_id(self) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
-            for successor in self.successors:
-                if isinstance(successor, BaseResourceNode):
-                    node_id = session.query(Node).filter_by(name=successor.name).first().id
-                    samples = session.query(Sample).filter_by(node_id=node_id, run_id=None).all()
-                    for sample in samples:
-                        sample.run_id = self.get_run_id()
-                        sample.state = "current"
-                        session.commit()
+        run_id = self.get_run_id()
+        with scoped_session_manager(self.ScopedSession, self) as session:
+            # update the samples of every resource node with a single UPDATE statement
+            node_ids = self._get_resource_node_ids(session)
+            session.query(Sample).filter(Sample.node_id.in_(node_ids), Sample.run_id.is_(None)).update(
+                {"run_id": run_id, "state": "current"}, synchronize_session=False
+            )
+            session.commit()
 
     def add_end_time(self) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
-            run_id = self.get_run_id()
-            for successor in self.successors:
-                if isinstance(successor, BaseResourceNode):
-                    node_id = session.query(Node).filter_by(name=successor.name).first().id
-                    samples = session.query(Sample).filter_by(node_id=node_id, run_id=run_id, end_time=None).all()
-                    for sample in samples:
-                        sample.end_time = datetime.utcnow()
-                        sample.state = "old"
-                        session.commit()
+        run_id = self.get_run_id()
+        with scoped_session_manager(self.ScopedSession, self) as session:
+            node_ids = self._get_resource_node_ids(session)
+            end_time = utcnow()
+            session.query(Sample).filter(Sample.node_id.in_(node_ids), Sample.run_id == run_id, Sample.end_time.is_(None)).update(
+                {"end_time": end_time, "state": "old"}, synchronize_session=False
+            )
+            session.commit()
 
     def start_run(self) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
+        with scoped_session_manager(self.ScopedSession, self) as session:
             run = Run()
             session.add(run)
             session.commit()
+            self._current_run_id = run.id
             self.log(f"--------------------------- started run {run.id} at {datetime.now()}")
     
     def end_run(self) -> None:
-        with scoped_session_manager(self.session_factory, self) as session:
+        with scoped_session_manager(self.ScopedSession, self) as session:
             run: Run = session.query(Run).filter_by(end_time=None).first()
-            run.end_time = datetime.utcnow()
+            run.end_time = utcnow()
             session.commit()
+            self._current_run_id = None
             self.log(f"--------------------------- ended run {run.id} at {datetime.now()}")
@@ -1,5 +1,6 @@
 import os
-from typing import List, Any, Union, Dict
+import time
+from typing import List, Set, Any, Union, Dict
 from datetime import datetime
 from logging import Logger
 from threading import Thread
@@ -28,6 +29,10 @@ class FilesystemStoreNode(BaseResourceNode):
         
         self.observer_thread = None
 
+        # locations of the files already recorded in the metadata store, kept in memory so the observer 
+        # doesn't have to query the metadata store to find out whether a file is new
+        self.recorded_files: Set[str] = set()
+
         if init_state not in ("new", "old"):
             raise ValueError(f"init_state argument of DataStoreNode must be either 'new' or 'old', not '{init_state}'.")
         self.init_state = init_state
@@ -47,22 +52,74 @@ class FilesystemStoreNode(BaseResourceNode):
     @BaseResourceNode.resource_accessor
     def record_new(self, filepath: str) -> Dict:
         self.metadata_store.create_entry(self, filepath=filepath, state="new")
+        self.recorded_files.add(filepath)
+        self.trigger()
+
+    @BaseResourceNode.resource_accessor
+    def record_new_files(self, filepaths: List[str]) -> None:
+        # records all the files in one metadata store transaction instead of one transaction per file
+        self.metadata_store.create_entries(self, [(filepath, "new", None) for filepath in filepaths])
+        self.recorded_files.update(filepaths)
+        self.trigger()
 
     @BaseResourceNode.resource_accessor
     def record_current(self, filepath: str) -> None:
         self.metadata_store.create_entry(self, filepath=filepath, state="current", run_id=self.metadata_store.get_run_id())
+        self.recorded_files.add(filepath)
+        self.trigger()
     
     def start_monitoring(self) -> None:
+        with self.resource_lock:
+            self.recorded_files = set([entry["location"] for entry in self.metadata_store.get_entries(self)])
 
         def _monitor_thread_func():
             self.log(f"Starting observer thread for node '{self.name}'")
-            while self.status == Status.RUNNING:
-                with self.resource_lock:
-                    for filename in os.listdir(self.path):
-                        filepath = os.path.join(self.path, filename)
-                        if self.metadata_store.entry_exists(self, filepath) is False:
-                            self.log(f"'{self.name}' detected file: {filepath}")
-                            self.record_new(filepath)
+
+            # back off exponentially (up to 50 ms) while the directory is unchanged instead of rescanning in a tight loop;
+            # the delay is reset as soon as a new file is detected
+            delay = 0.0005
+            scanned_mtime = None
+            scanned_at = 0
+            while True:
+                # sleep while the node is paused instead of stopping the observer; resume() wakes the node's condition
+                with self._wake:
+                    self._wake.wait_for(lambda: self.status not in (Status.PAUSING, Status.PAUSED))
+
+                if self.status != Status.RUNNING:
+                    break
+
+                # adding, removing, or renaming a file changes the directory's mtime, so the directory is only rescanned 
+                # when its mtime differs from the one seen at the last scan; an mtime less than 2 seconds older than the last scan
+                # isn't trusted, since a file created within the same filesystem timestamp granule would leave it unchanged
+                new_files = []
+                now = time.time_ns()
+                mtime = os.stat(self.path).st_mtime_ns
+                if (mtime != scanned_mtime) or (scanned_at - mtime < 2_000_000_000):
+                    scanned_mtime, scanned_at = mtime, now
+
+                    with self.resource_lock:
+                        # scandir usually gets the file type from the directory listing itself, so there's no extra stat per entry
+                        with os.scandir(self.path) as entries:
+                            for entry in entries:
+                                # most entries are files that are already recorded; the set lookup rejects them 
+                                # before is_file() is consulted, which falls back to a stat when the type isn't in the listing
+                                if entry.path in self.recorded_files:
+                                    continue
+
+                                if entry.is_file() is True:
+                                    new_files.append(entry.path)
+                    
+                        # everything found in this pass is logged and recorded at once, 
+                        # so a large directory (e.g., on the first pass) costs one log line and one write to the metadata store
+                        if len(new_files) > 0:
+                            self.log(f"'{self.name}' detected {len(new_files)} new file(s)")
+                            self.record_new_files(new_files)
+
+                if len(new_files) > 0:
+                    delay = 0.0005
+                else:
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
                 
         self.observer_thread = Thread(name=f"{self.name}_observer", target=_monitor_thread_func)
         self.observer_thread.start()
@@ -0,0 +1,39 @@
+import os
+import shutil
+
+from anacostia_pipeline.resources.filesystem_store import FilesystemStoreNode
+from anacostia_pipeline.metadata.sql_metadata_store import SqliteMetadataStore
+
+
+tests_path = "./testing_artifacts/metadata_store"
+
+
+def create_nodes():
+    metadata_store = SqliteMetadataStore(name="metadata_store", uri=f"sqlite:///{tests_path}/metadata_store/metadata.db")
+    data_store = FilesystemStoreNode("data_store", f"{tests_path}/data_store", metadata_store, monitoring=False)
+    metadata_store.setup()
+    metadata_store.create_resource_tracker(data_store)
+    return metadata_store, data_store
+
+
+def test_reused_database():
+    if os.path.exists(tests_path) is True:
+        shutil.rmtree(tests_path)
+    os.makedirs(tests_path)
+
+    # first launch: record a file
+    metadata_store, data_store = create_nodes()
+    metadata_store.create_entry(data_store, filepath=f"{data_store.path}/file0.txt", state="new")
+    assert metadata_store.get_num_entries(data_store, "new") == 1
+
+    # second launch on the same database: the node's tracker row is created again under the same name,
+    # the node must still resolve to the tracker that owns the entries recorded by the first launch
+    metadata_store, data_store = create_nodes()
+    assert metadata_store.get_num_entries(data_store, "new") == 1
+    assert metadata_store.get_num_entries(data_store, "all") == 1
+    assert len(metadata_store.get_entries(data_store)) == 1
+
+
+if __name__ == "__main__":
+    test_reused_database()
+    print("metadata store tests passed")